@@ -1,4 +1,5 @@
 import random
+from collections import deque
 
 UNCHECKED = 0b01110000
 CHECKED   = 0b10000000
@@ -7,6 +8,26 @@ UNSURE    = 0b00100000
 IS_MINE   = 0b00010000
 SURROUNDING_MASK = 0b00001111
 
+def _display_value(v: int, game_over: bool) -> int:
+    """Return the value `get_board` shows for a space whose byte is `v`. Mines
+    are only revealed if `game_over` is true.
+    """
+    if game_over and v & IS_MINE:
+        return IS_MINE
+    elif v & CHECKED:
+        return v & SURROUNDING_MASK
+    elif v & FLAGGED:
+        return FLAGGED
+    elif v & UNSURE:
+        return UNSURE
+    else:
+        return UNCHECKED
+
+# every possible space byte mapped to its displayed value, so the whole board
+# can be converted in a single `bytearray.translate` call
+DISPLAY_LUT = bytes(_display_value(v, False) for v in range(256))
+DISPLAY_LUT_GAMEOVER = bytes(_display_value(v, True) for v in range(256))
+
 class PyMinesState:
     __slots__ = (
         "_b",       # List of bytes representing board spaces
@@ -14,32 +35,35 @@ class PyMinesState:
         "_n_rows",  # number of rows (also length of a column)
         "_n_cols",  # number of columns (also length of a row)
         "_mines",   # Set of indices where mines are located
+        "_neighbors", # Tuples of indices surrounding each space
+        "_checked_count", # number of spaces that have been checked
+        "_safe_count",    # number of spaces that aren't mines
         "_win",     # True if this is a winning state
         "_lose"     # True if this is a losing state
     )
 
     def __init__(self, n_rows: int, n_cols: int, n_mines: int):
         n_spaces = n_rows * n_cols
-        if n_mines not in range(1, n_spaces):
+        if not 1 <= n_mines < n_spaces:
             raise ValueError("too many/few mines")
         
-        self._b = bytearray([0 for _ in range(n_spaces)])
+        self._b = bytearray(n_spaces)
         self._n_mines = n_mines
         self._n_rows = n_rows
         self._n_cols = n_cols
         self._win = False
         self._lose = False
-        self._mines = set()
+        self._checked_count = 0
+        self._safe_count = n_spaces - n_mines
+        self._neighbors = self._build_neighbors()
 
         # populate mines
-        l = random.sample(range(n_spaces), n_mines)
-        self._mines = self._mines.union(l)
+        self._mines = set(random.sample(range(n_spaces), n_mines))
 
         # DEBUG
         # self._mines = { }
         
-        for m in self._mines:
-            self._set_mine(m)
+        self._set_mines(self._mines)
     
     def get_num_spaces(self):
         """Return the total number of spaces on the board."""
@@ -72,24 +96,14 @@ class PyMinesState:
         # TODO add losing move and correct flags for win/lose states
         n_spaces = self.get_num_spaces()
         row_len = self._n_cols
-        out = []
-        for i in range(n_spaces):
-            game_over = self.is_win_state() or self.is_lose_state()
-            if game_over and self._is_mine(i):
-                out.append(IS_MINE)
-            elif self._is_checked(i):
-                out.append(self._adjacent_mines(i))
-            elif self._is_flagged(i):
-                out.append(FLAGGED)
-            elif self._is_unsure(i):
-                out.append(UNSURE)
-            else:
-                out.append(UNCHECKED)
+        game_over = self._win or self._lose
+        lut = DISPLAY_LUT_GAMEOVER if game_over else DISPLAY_LUT
+        out = self._b.translate(lut)
             
         if formatted:
-            return [out[i:i + row_len] for i in range(0, n_spaces, row_len)]
+            return [list(out[i:i + row_len]) for i in range(0, n_spaces, row_len)]
         else:
-            return out
+            return list(out)
         
     def get_mines(self, formatted = True) -> set[int] | set[tuple[int]]:
         """Return a list of locations of mines for this game. If `formatted` is
@@ -97,14 +111,14 @@ class PyMinesState:
         (row, column). Otherwise, the locations will be given as single ints
         corresponding to the board as a flat list."""
         if formatted:
-            i2rowcol = lambda i: (i // self._n_rows, i % self._n_rows)
-            return set(map(i2rowcol, self._mines))
+            n_cols = self._n_cols
+            return {divmod(i, n_cols) for i in self._mines}
         else:
             return self._mines
 
     def click_space(self, row: int, col: int):
         """Register an input action on the space at the given coordinates."""
-        i = self._get_index(row, col)
+        i = row * self._n_cols + col
         if self._is_mine(i):
             self._lose = True
         else:
@@ -113,21 +127,18 @@ class PyMinesState:
 
     def click_flag(self, row: int, col: int):
         """Add a flag at the space at the given coordinates."""
-        i = self._get_index(row, col)
-        self.click_clear(row, col)
-        self._set_flagged(i, True)
+        i = row * self._n_cols + col
+        self._b[i] = self._b[i] & ~(FLAGGED | UNSURE) | FLAGGED
 
     def click_unsure(self, row: int, col: int):
         """Add a question mark to the space at the given coordinates."""
-        i = self._get_index(row, col)
-        self.click_clear(row, col)
-        self._set_unsure(i, True)
+        i = row * self._n_cols + col
+        self._b[i] = self._b[i] & ~(FLAGGED | UNSURE) | UNSURE
 
     def click_clear(self, row: int, col: int):
         """Clear flag and/or question mark at the given coordinates."""
-        i = self._get_index(row, col)
-        self._set_flagged(i, False)
-        self._set_unsure(i, False)
+        i = row * self._n_cols + col
+        self._b[i] &= ~(FLAGGED | UNSURE)
 
     def is_win_state(self) -> bool:
         """Return True if the current state is a winning state."""
@@ -137,130 +148,86 @@ class PyMinesState:
         """Return True if the current state is a losing state."""
         return self._lose
 
-    def _get_index(self, row: int, col: int) -> int:
-        """Calculate the index of the array corresponding to the given 
-        coordinates on the board.
-        """
-        return row * self._n_cols + col
-
     def _check_win_state(self):
         """Set `self._win` to True if all unchecked spaces are mines."""
-        self._win = self._mines == self._get_unchecked()
+        self._win = self._checked_count == self._safe_count
 
-    def _get_space(self, i: int | tuple[int]) -> int:
-        """Return the value of the space at `i`, which can be either a 2tuple of 
-        coordinates (row,col) or the index of the space in the board array.
+    def _build_neighbors(self) -> list[tuple[int]]:
+        """Return a list where element `i` is a tuple of the indices of spaces
+        surrounding the space at index `i`. Computed once per board so traversals
+        don't redo any border arithmetic.
         """
-        if type(i) is tuple:
-            i = self._get_index(*i)
-        return self._b[i]
-    
-    def _set_space(self, i: int | tuple[int], new_value: int):
-        """Set the value of the space at `i` to `new_value`. `i` can be either a 
-        2tuple of coordinates (row,col) or the index of the space in the board 
-        array.
+        n_rows, n_cols = self._n_rows, self._n_cols
+
+        # offsets to the surrounding spaces for every combination of board 
+        # edges a space can be on, indexed by a mask of
+        # top | bottom << 1 | left << 2 | right << 3
+        templates = []
+        for edges in range(16):
+            templates.append(tuple(
+                dr * n_cols + dc
+                for dr in (-1, 0, 1)
+                for dc in (-1, 0, 1)
+                if (dr or dc)
+                and not (dr == -1 and edges & 0b0001)
+                and not (dr == 1 and edges & 0b0010)
+                and not (dc == -1 and edges & 0b0100)
+                and not (dc == 1 and edges & 0b1000)
+            ))
+
+        neighbors = []
+        i = 0
+        for row in range(n_rows):
+            row_edges = (row == 0) | (row == n_rows - 1) << 1
+            for col in range(n_cols):
+                edges = row_edges | (col == 0) << 2 | (col == n_cols - 1) << 3
+                neighbors.append(tuple(i + d for d in templates[edges]))
+                i += 1
+        return neighbors
+
+    def _set_mines(self, mines: set[int]):
+        """Set mines at all of the given spaces, updating the adjacent mine 
+        counts of the surrounding spaces in a single pass over the board.
         """
-        if type(i) is tuple:
-            i = self._get_index(*i)
-        self._b[i] = new_value
-
-    def _get_surrounding(self, i: int):
-        """Return a set of indices of spaces surrounding the space at the given
-        index `i`.
-        """
-        s = []
-        for j in [-1, 0, 1]:
-            over_left_border = j == -1 and i % self._n_cols == 0
-            over_right_border = j == 1 and i % self._n_cols == self._n_cols - 1
-            if over_left_border or over_right_border:
-                continue
-            for k in [-1, 0, 1]:
-                new_i = i + k * self._n_cols + j
-                if new_i == i or new_i not in range(0, self.get_num_spaces()):
-                    continue
-                s.append(new_i)
-        return s
-
-    def _set_mine(self, i: int):
-        """Set a mine at the given space, updating the surrounding spaces
-        adjacent mine count in the process.
-        """
-        self._set_space(i, IS_MINE)
-
-        # increment counts around mine
-        surr = self._get_surrounding(i)
-        for s in surr:
-            if s not in self._mines:
-                val = self._get_space(s)
-                self._set_space(s, val + 1)
-
-    def _is_mine(self, i: int) -> int:
+        b = self._b
+        neighbors = self._neighbors
+
+        # increment counts around every mine, then overwrite the mines 
+        # themselves so their counts are discarded
+        for m in mines:
+            for s in neighbors[m]:
+                b[s] += 1
+        for m in mines:
+            b[m] = IS_MINE
+
+    def _is_mine(self, i: int) -> bool:
         """Return `True` if the space at `i` contains a mine."""
-        return self._get_space(i) & IS_MINE
-
-    def _set_flagged(self, i: int, flagged: bool):
-        """Set whether or not the space at `i` is flagged or not according
-        to `flagged`.
-        """
-        old = self._get_space(i)
-        if flagged:
-            new = old | FLAGGED
-        else:
-            new = old & ~FLAGGED
-        self._set_space(i, new)
-
-    def _is_flagged(self, i: int) -> int:
-        """Return a nonzero integer if the space at `i` is flagged."""
-        return self._get_space(i) & FLAGGED
-
-    def _set_unsure(self, i: int, unsure: bool):
-        """Set whether or not the space at `i` has a question mark or not 
-        according to `unsure`.
-        """
-        old = self._get_space(i)
-        if unsure:
-            new = old | UNSURE
-        else:
-            new = old & ~UNSURE
-        self._set_space(i, new)
-
-    def _is_unsure(self, i: int) -> int:
-        """Returns a nonzero integer if the space at `i` has a question mark."""
-        return self._get_space(i) & UNSURE
-
-    def _set_checked(self, i: int):
-        """Set the space at `i` as having been checked."""
-        old = self._get_space(i)
-        self._set_space(i, old | CHECKED)
-
-    def _is_checked(self, i: int):
-        """Returns a nonzero integer if the space at `i` has been checked."""
-        return self._get_space(i) & CHECKED
-    
-    def _get_unchecked(self) -> set[int]:
-        """Return a set of all spaces that haven't been checked."""
-        unchkd = set()
-        for i in range(self.get_num_spaces()):
-            if not self._is_checked(i):
-                unchkd.add(i)
-        return unchkd
-
-    def _adjacent_mines(self, i: int) -> int:
-        """Return the number of mines adjacent to the space at `i`"""
-        return self._get_space(i) & SURROUNDING_MASK
+        return bool(self._b[i] & IS_MINE)
 
     def _bfs(self, root_i: int):
         """Broadly traverse the board starting at `root_i`, marking all spaces
         visited as checked and stopping at spaces that have an adjacent mine
         count. The board is modified in place."""
-        q = {root_i}
-        while len(q) > 0:
-            i = q.pop()
-            self._set_checked(i)
-            if self._adjacent_mines(i):
+        b = self._b
+        neighbors = self._neighbors
+        n_checked = 0
+        visited = {root_i}
+        q = deque((root_i,))
+        while q:
+            i = q.popleft()
+
+            # mark the space as checked, counting it the first time
+            v = b[i]
+            if not v & CHECKED:
+                n_checked += 1
+                b[i] = v | CHECKED
+            if v & SURROUNDING_MASK:
                 continue
-            surr_spaces = self._get_surrounding(i)
-            q.update(filter(lambda x: not self._is_checked(x), surr_spaces))
+            for n in neighbors[i]:
+                if n not in visited and not b[n] & CHECKED:
+                    visited.add(n)
+                    q.append(n)
+        self._checked_count += n_checked
 
 # basic text interface when run from command line
 # TODO: maybe use letter-digit coordinates (A1, B2, etc)
@@ -274,30 +241,32 @@ unsure row col - place a ? at row,col (alias: u)
 clear row col  - remove flag or ? at row,col (alias: x)
 """
 
+def _glyph(v: int) -> str:
+    """Return the string `print_board` uses for a space with display value `v`
+    as returned by `PyMinesState.get_board`.
+    """
+    if v == IS_MINE:
+        return "[*]"
+    elif v == UNCHECKED:
+        return "[⏹]"
+    elif v == FLAGGED:
+        return "[⚑]"
+    elif v == UNSURE:
+        return "[?]"
+    else:
+        return f"[{v:1}]" if v > 0 else '[ ]'
+
+# every possible display value mapped to its glyph
+GLYPH_LUT = [_glyph(v) for v in range(256)]
+
 def print_board(state: PyMinesState):
     """Print the board"""
     b = state.get_board()
     _, row_length = state.get_dims()
-    out = ""
-    for i, row in enumerate(b):
-        line = ""
-        for col in row:
-            if col == IS_MINE:
-                line += "[*]"
-            elif col == UNCHECKED:
-                line += "[⏹]"
-            elif col == FLAGGED:
-                line += "[⚑]"
-            elif col == UNSURE:
-                line += "[?]"
-            else:
-                line += f"[{col:1}]" if col > 0 else '[ ]'
-        out += f"{i:2} {line} {i:2}\n"
-    header = "   "
-    for i in range(row_length):
-        header += f"{i:2} "
-    out = f"{header}\n{out}{header}"
-    print(out)
+    lines = ["".join([GLYPH_LUT[v] for v in row]) for row in b]
+    out = "\n".join(f"{i:2} {line} {i:2}" for i, line in enumerate(lines))
+    header = "   " + "".join(f"{i:2} " for i in range(row_length))
+    print(f"{header}\n{out}\n{header}")
 
 
 def game_loop(state: PyMinesState):    